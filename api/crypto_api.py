@@ -15,7 +15,7 @@ import zipfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from cryptolib import CryptoSystem
-from cryptolib.models import (
+from cryptolib.api_models import (
     FileInfo, FileDetails, EncryptResponse, FolderInfo,
     CreateFolderRequest, FolderContentsResponse, MoveFileRequest, DecryptResponse
 )
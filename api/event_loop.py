@@ -0,0 +1,48 @@
+"""
+Choix de la boucle d'événements utilisée par uvicorn pour servir l'API
+"""
+
+import asyncio
+import platform
+import sys
+
+# Version minimale du noyau pour les opérations réseau io_uring utilisées par uringcore
+URING_MIN_KERNEL = (5, 11)
+
+
+def _kernel_version() -> tuple:
+    """Retourne la version (majeure, mineure) du noyau, (0, 0) si illisible"""
+    try:
+        return tuple(int(part) for part in platform.release().split("-")[0].split(".")[:2])
+    except ValueError:
+        return (0, 0)
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Crée la boucle d'événements du serveur (--loop api.event_loop:new_event_loop)
+
+    uvicorn (>= 0.36) appelle directement cet objet, sans argument, pour obtenir
+    une boucle. Ordre de préférence :
+    - uringcore (E/S io_uring) sous Linux >= 5.11, s'il est installé. Ce paquet
+      n'est pas publié sur PyPI : il doit être installé séparément.
+    - uvloop s'il est installé (inclus dans uvicorn[standard] sous Linux/macOS)
+    - la boucle asyncio standard
+
+    Returns:
+        Nouvelle boucle d'événements
+    """
+    if sys.platform == "linux" and _kernel_version() >= URING_MIN_KERNEL:
+        try:
+            import uringcore
+        except ImportError:
+            # Optionnel et hors PyPI : absent dans la plupart des installations
+            pass
+        else:
+            return uringcore.EventLoopPolicy().new_event_loop()
+
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
@@ -15,5 +15,6 @@ def main():
         host="127.0.0.1",
         port=4040,
         reload=False,
-        log_level="info"
+        log_level="info",
+        loop="API.event_loop:new_event_loop"
     )
\ No newline at end of file
@@ -137,19 +137,18 @@ class CryptoSystem:
     
     def delete_folder(self, folder_path: str, recursive: bool = False):
         """Supprime un dossier et ses fichiers (chunks et keys)"""
-        # Si récursif, supprimer d'abord les sous-dossiers
+        # Dossiers concernés : le dossier et, si récursif, tous ses sous-dossiers
+        folder_paths = [folder_path]
         if recursive:
-            subfolders = self.folder_manager.list_folders(folder_path)
-            for subfolder in subfolders:
-                self.delete_folder(subfolder['folder_path'], recursive=True)
+            folder_paths.extend(f['folder_path'] for f in self.folder_manager.list_descendants(folder_path))
         
-        # Supprimer tous les fichiers dans ce dossier
-        files_in_folder = self.metadata_manager.list_files(folder_path)
-        for file_info in files_in_folder:
-            self.delete_file(file_info['file_id'], delete_chunks=True)
+        # Supprimer tous les fichiers de ces dossiers
+        for path in folder_paths:
+            for file_info in self.metadata_manager.list_files(path):
+                self.delete_file(file_info['file_id'], delete_chunks=True)
         
-        # Supprimer le dossier lui-même
-        return self.folder_manager.delete_folder(folder_path, recursive=False)
+        # Supprimer les dossiers en un seul passage
+        return self.folder_manager.delete_folder(folder_path, recursive=recursive)
     
     
     def get_folder_contents(self, folder_path: str = "/"):
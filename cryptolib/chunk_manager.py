@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import List, Dict
 from .models import EncryptedChunk
 from .config import CHUNK_SIZE, CHUNKS_DIR
+from .utils import digest_matches
 
 
 logger = logging.getLogger(__name__)
@@ -37,10 +38,13 @@ class ChunkManager:
         
         logger.info(f"  ✂️  Découpage en {num_chunks} chunks...")
         
+        # Les chunks sont des vues sur data : aucune copie des octets chiffrés
+        view = memoryview(data)
+        
         for i in range(num_chunks):
             start = i * self.chunk_size
             end = min(start + self.chunk_size, total_size)
-            chunk_data = data[start:end]
+            chunk_data = view[start:end]
             
             chunk_hash = hashlib.sha256(chunk_data).hexdigest()
             chunk_id = chunk_hash[:16]
@@ -95,14 +99,14 @@ class ChunkManager:
                 chunk_data = f.read()
             
             # Vérification du hash
-            actual_hash = hashlib.sha256(chunk_data).hexdigest()
+            actual_digest = hashlib.sha256(chunk_data).digest()
             expected_hash = chunk_meta['hash']
             
-            if actual_hash != expected_hash:
+            if not digest_matches(actual_digest, expected_hash):
                 raise ValueError(
                     f"❌ Chunk corrompu: {chunk_path.name}\n"
                     f"   Hash attendu: {expected_hash}\n"
-                    f"   Hash reçu:    {actual_hash}"
+                    f"   Hash reçu:    {actual_digest.hex()}"
                 )
             
             chunks_data.append({
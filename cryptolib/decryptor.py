@@ -1,12 +1,11 @@
 """Module de déchiffrement"""
 
-import hashlib
 import logging
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from .chunk_manager import ChunkManager
 from .metadata_manager import MetadataManager
-from .utils import format_size
+from .utils import format_size, new_hasher, digest_matches
 
 
 logger = logging.getLogger(__name__)
@@ -51,7 +50,7 @@ class Decryptor:
         logger.info(f"  📦 Données réassemblées: {format_size(len(ciphertext))}")
 
         # 5. Vérification intégrité
-        self._verify_integrity(ciphertext, file_id)
+        self._verify_integrity(ciphertext, file_id, metadata.get('file_id_algorithm', 'sha256'))
         logger.info(f"  ✅ Intégrité vérifiée")
 
         # 6. Déchiffrement
@@ -78,15 +77,18 @@ class Decryptor:
         return str(output_path)
     
     
-    def _verify_integrity(self, data: bytes, expected_file_id: str):
+    def _verify_integrity(self, data: bytes, expected_file_id: str, algorithm: str = "sha256"):
         """Vérifie l'intégrité des données"""
-        actual_file_id = hashlib.sha256(data).hexdigest()[:16]
+        hasher = new_hasher(algorithm)
+        hasher.update(data)
+        # Le file_id correspond aux 8 premiers octets (16 caractères hex) du hash
+        actual_digest = hasher.digest()[:8]
         
-        if actual_file_id != expected_file_id:
+        if not digest_matches(actual_digest, expected_file_id):
             raise ValueError(
                 f"❌ CORRUPTION DÉTECTÉE!\n"
                 f"   File ID attendu: {expected_file_id}\n"
-                f"   File ID reçu:    {actual_file_id}"
+                f"   File ID reçu:    {actual_digest.hex()}"
             )
     
     
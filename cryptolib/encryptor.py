@@ -1,21 +1,28 @@
 """Module de chiffrement"""
 
 import os
-import hashlib
+import mmap
 import logging
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Tuple
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from .models import EncryptedChunk
 from .chunk_manager import ChunkManager
 from .metadata_manager import MetadataManager
 from .config import KEY_SIZE_BITS
-from .utils import format_size
+from .utils import format_size, new_hasher, FILE_ID_ALGORITHM
 
 
 logger = logging.getLogger(__name__)
 
+# Taille des blocs chiffrés puis hachés à la volée
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+# Marge exigée par update_into en sortie (taille de bloc AES - 1)
+UPDATE_INTO_MARGIN = algorithms.AES.block_size // 8 - 1
+
 
 class Encryptor:
     """Gère le chiffrement des fichiers"""
@@ -53,29 +60,32 @@ class Encryptor:
         
         logger.info(f"🔐 Chiffrement: {original_name}")
         
-        # 1. Lecture du fichier
-        with open(file_path, 'rb') as f:
-            plaintext = f.read()
-        
-        original_size = len(plaintext)
-        logger.info(f"  📄 Taille: {format_size(original_size)}")
-        
-        # 2. Génération clé + nonce
+        # 1. Génération clé + nonce
         key, nonce = self._generate_key_and_nonce()
         logger.info(f"  🔑 Clé générée")
         
-        # 3. Chiffrement
-        ciphertext = self._encrypt_data(plaintext, key, nonce)
-        logger.info(f"  ✅ Données chiffrées: {format_size(len(ciphertext))}")
+        # 2. Lecture + chiffrement du fichier
+        with open(file_path, 'rb') as f:
+            original_size = os.fstat(f.fileno()).st_size
+            logger.info(f"  📄 Taille: {format_size(original_size)}")
+            
+            if original_size:
+                # Fichier projeté en mémoire : chiffré directement depuis le
+                # page cache, sans copie intermédiaire dans un bytes
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as plaintext:
+                    ciphertext, file_id = self._encrypt_stream(plaintext, key, nonce)
+            else:
+                # mmap refuse les fichiers vides
+                ciphertext, file_id = self._encrypt_stream(b"", key, nonce)
         
-        # 4. Génération file_id
-        file_id = self._generate_file_id(ciphertext)
+        # 3. file_id : hash du chiffré, calculé pendant le chiffrement
+        logger.info(f"  ✅ Données chiffrées: {format_size(len(ciphertext))}")
         logger.info(f"  🆔 File ID: {file_id}")
         
-        # 5. Découpage en chunks
+        # 4. Découpage en chunks
         chunks = self.chunk_manager.split_into_chunks(ciphertext, file_id)
         
-        # 6. Sauvegarde métadonnées
+        # 5. Sauvegarde métadonnées
         metadata = self.metadata_manager.save_metadata(
             file_id=file_id,
             original_name=original_name,
@@ -84,7 +94,8 @@ class Encryptor:
             key=key,
             nonce=nonce,
             chunks=chunks,
-            folder_path=folder_path
+            folder_path=folder_path,
+            file_id_algorithm=FILE_ID_ALGORITHM
         )
         
         logger.info(f"✅ Chiffrement terminé\n")
@@ -105,12 +116,35 @@ class Encryptor:
         return key, nonce
     
     
-    def _encrypt_data(self, plaintext: bytes, key: bytes, nonce: bytes) -> bytes:
-        """Chiffre les données avec AES-256-GCM"""
-        aesgcm = AESGCM(key)
-        return aesgcm.encrypt(nonce, plaintext, associated_data=None)
-    
-    
-    def _generate_file_id(self, data: bytes) -> str:
-        """Génère un ID unique basé sur le hash"""
-        return hashlib.sha256(data).hexdigest()[:16]
+    def _encrypt_stream(self, plaintext, key: bytes, nonce: bytes) -> Tuple[bytearray, str]:
+        """
+        Chiffre les données avec AES-256-GCM et calcule le file_id au passage
+        
+        Le contexte GCM bas niveau écrit directement dans un tampon préalloué
+        (aucune copie intermédiaire du chiffré), bloc par bloc : chaque bloc
+        est haché tant qu'il est encore en cache, ce qui évite une seconde
+        passe complète sur le chiffré. Le chiffré a le même format
+        qu'AESGCM.encrypt : chiffré || tag de 16 octets.
+        
+        Returns:
+            (chiffré, file_id)
+        """
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+        hasher = new_hasher(FILE_ID_ALGORITHM)
+        size = len(plaintext)
+        
+        ciphertext = bytearray(size + UPDATE_INTO_MARGIN)
+        written = 0
+        with memoryview(plaintext) as src, memoryview(ciphertext) as out:
+            for start in range(0, size, STREAM_BLOCK_SIZE):
+                block_size = encryptor.update_into(src[start:start + STREAM_BLOCK_SIZE], out[written:])
+                hasher.update(out[written:written + block_size])
+                written += block_size
+        encryptor.finalize()
+        
+        del ciphertext[written:]
+        ciphertext += encryptor.tag
+        hasher.update(encryptor.tag)
+        
+        # Génère un ID unique basé sur le hash BLAKE3
+        return ciphertext, hasher.hexdigest()[:16]
@@ -1,13 +1,16 @@
 """Gestion des dossiers"""
 
-import json
+import os
 import logging
 import hashlib
+from collections import deque
+from dataclasses import asdict
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional
-from datetime import datetime
 from .models import FolderMetadata
 from .config import KEYS_DIR
+from .utils import json_dumps, atomic_write_bytes, read_json_files, unlink_files, utc_timestamp, normalize_path
 
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,13 @@ class FolderManager:
         self.keys_dir = keys_dir
         self.folders_dir = keys_dir / "_folders"
         self.folders_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Index en mémoire (chargé au premier accès) :
+        # folder_path -> métadonnées, et parent_path -> {folder_path: métadonnées}
+        self._folders: Optional[Dict[str, Dict]] = None
+        self._children: Dict[str, Dict[str, Dict]] = {}
+        # mtime (ns) de folders_dir lors du dernier chargement de l'index
+        self._mtime_ns: Optional[int] = None
     
     
     def create_folder(self, folder_name: str, parent_path: str = "/") -> FolderMetadata:
@@ -34,7 +44,7 @@ class FolderManager:
             Objet FolderMetadata
         """
         # Normaliser les chemins
-        parent_path = self._normalize_path(parent_path)
+        parent_path = normalize_path(parent_path)
         folder_name = folder_name.strip().strip("/")
         
         if not folder_name:
@@ -63,16 +73,15 @@ class FolderManager:
         )
         
         # Sauvegarder les métadonnées
-        folder_path_file = self.folders_dir / f"{folder_id}.json"
+        folder_data = asdict(folder)
+        folder_path_file = self._folder_file(folder_id)
+        # Relevé avant la création éventuelle du shard, qui modifie aussi le mtime
+        mtime_before = os.stat(self.folders_dir).st_mtime_ns
+        folder_path_file.parent.mkdir(exist_ok=True)
+        atomic_write_bytes(folder_path_file, json_dumps(folder_data))
         
-        with open(folder_path_file, 'w') as f:
-            json.dump({
-                'folder_id': folder.folder_id,
-                'folder_name': folder.folder_name,
-                'folder_path': folder.folder_path,
-                'parent_path': folder.parent_path,
-                'created_at': folder.created_at
-            }, f, indent=2)
+        self._index_add(folder_data)
+        self._touch(mtime_before)
         
         logger.info(f"📁 Dossier créé: {folder_path}")
         return folder
@@ -80,15 +89,7 @@ class FolderManager:
     
     def folder_exists(self, folder_path: str) -> bool:
         """Vérifie si un dossier existe"""
-        folder_path = self._normalize_path(folder_path)
-        
-        for folder_file in self.folders_dir.glob("*.json"):
-            with open(folder_file, 'r') as f:
-                folder_data = json.load(f)
-                if folder_data['folder_path'] == folder_path:
-                    return True
-        
-        return False
+        return normalize_path(folder_path) in self._index()
     
     
     def get_folder(self, folder_path: str) -> Optional[Dict]:
@@ -101,15 +102,8 @@ class FolderManager:
         Returns:
             Dictionnaire des métadonnées ou None si le dossier n'existe pas
         """
-        folder_path = self._normalize_path(folder_path)
-        
-        for folder_file in self.folders_dir.glob("*.json"):
-            with open(folder_file, 'r') as f:
-                folder_data = json.load(f)
-                if folder_data['folder_path'] == folder_path:
-                    return folder_data
-        
-        return None
+        folder_data = self._index().get(normalize_path(folder_path))
+        return dict(folder_data) if folder_data else None
     
     
     def list_folders(self, parent_path: str = "/") -> List[Dict]:
@@ -122,40 +116,14 @@ class FolderManager:
         Returns:
             Liste des dossiers
         """
-        parent_path = self._normalize_path(parent_path)
-        folders = []
-        
-        for folder_file in self.folders_dir.glob("*.json"):
-            with open(folder_file, 'r') as f:
-                folder_data = json.load(f)
-                if folder_data['parent_path'] == parent_path:
-                    folders.append({
-                        'folder_id': folder_data['folder_id'],
-                        'folder_name': folder_data['folder_name'],
-                        'folder_path': folder_data['folder_path'],
-                        'parent_path': folder_data['parent_path'],
-                        'created_at': folder_data['created_at']
-                    })
-        
-        return folders
+        parent_path = normalize_path(parent_path)
+        self._index()
+        return [dict(f) for f in self._children.get(parent_path, {}).values()]
     
     
     def list_all_folders(self) -> List[Dict]:
         """Liste tous les dossiers"""
-        folders = []
-        
-        for folder_file in self.folders_dir.glob("*.json"):
-            with open(folder_file, 'r') as f:
-                folder_data = json.load(f)
-                folders.append({
-                    'folder_id': folder_data['folder_id'],
-                    'folder_name': folder_data['folder_name'],
-                    'folder_path': folder_data['folder_path'],
-                    'parent_path': folder_data['parent_path'],
-                    'created_at': folder_data['created_at']
-                })
-        
-        return folders
+        return [dict(f) for f in self._index().values()]
     
     
     def delete_folder(self, folder_path: str, recursive: bool = False) -> bool:
@@ -169,32 +137,57 @@ class FolderManager:
         Returns:
             True si le dossier a été supprimé, False sinon
         """
-        folder_path = self._normalize_path(folder_path)
+        folder_path = normalize_path(folder_path)
         
         # Vérifier si le dossier existe
         folder = self.get_folder(folder_path)
         if not folder:
             return False
         
-        # Si récursif, supprimer les sous-dossiers et fichiers
+        # Si récursif, supprimer aussi tous les sous-dossiers, collectés en un seul parcours
+        # Note: Les fichiers dans les dossiers seront gérés par MetadataManager
+        to_delete = [folder]
         if recursive:
-            # Supprimer les sous-dossiers
-            subfolders = self.list_folders(folder_path)
-            for subfolder in subfolders:
-                self.delete_folder(subfolder['folder_path'], recursive=True)
-            
-            # Note: Les fichiers dans le dossier seront gérés par MetadataManager
+            to_delete.extend(self.list_descendants(folder_path))
         
-        # Supprimer le fichier de métadonnées
-        folder_file = self.folders_dir / f"{folder['folder_id']}.json"
-        if folder_file.exists():
-            folder_file.unlink()
-            logger.info(f"🗑️  Dossier supprimé: {folder_path}")
+        # Supprimer les fichiers de métadonnées en un seul passage
+        for folder_data in to_delete:
+            self._index_remove(folder_data)
+        mtime_before = os.stat(self.folders_dir).st_mtime_ns
+        removed = unlink_files([self._stored_folder_file(f['folder_id']) for f in to_delete])
+        
+        if any(removed):
+            self._touch(mtime_before)
+        if removed[0]:
+            if len(to_delete) > 1:
+                logger.info(f"🗑️  Dossier supprimé: {folder_path} ({len(to_delete) - 1} sous-dossier(s))")
+            else:
+                logger.info(f"🗑️  Dossier supprimé: {folder_path}")
             return True
         
         return False
     
     
+    def list_descendants(self, folder_path: str) -> List[Dict]:
+        """
+        Liste tous les sous-dossiers d'un dossier, à toutes les profondeurs
+        
+        Args:
+            folder_path: Chemin du dossier
+            
+        Returns:
+            Liste des sous-dossiers (parcours en largeur)
+        """
+        self._index()
+        descendants = []
+        pending = deque([normalize_path(folder_path)])
+        while pending:
+            for child_path, child in self._children.get(pending.popleft(), {}).items():
+                descendants.append(dict(child))
+                pending.append(child_path)
+        return descendants
+    
+    
     def get_folder_id(self, folder_path: str) -> Optional[str]:
         """Récupère l'ID d'un dossier depuis son chemin"""
         folder = self.get_folder(folder_path)
@@ -203,34 +196,104 @@ class FolderManager:
         return None
     
     
-    @staticmethod
-    def _normalize_path(path: str) -> str:
-        """Normalise un chemin (supprime les doublons de /, etc.)"""
-        if not path:
-            return "/"
+    def _index(self) -> Dict[str, Dict]:
+        """Retourne l'index folder_path -> métadonnées, à jour avec le disque"""
+        self._ensure_fresh()
+        return self._folders
+    
+    
+    def _ensure_fresh(self):
+        """Recharge l'index si folders_dir a changé (ex: modifié par un autre processus)"""
+        mtime_ns = os.stat(self.folders_dir).st_mtime_ns
+        if self._folders is None or mtime_ns != self._mtime_ns:
+            self._load_all(mtime_ns)
+    
+    
+    def _load_all(self, mtime_ns: int):
+        """Construit l'index en lisant une seule fois tous les fichiers de dossiers"""
+        self._folders = {}
+        self._children = {}
+        
+        # _folders/XX/<folder_id>.json, plus les anciens fichiers à la racine
+        paths = []
+        with os.scandir(self.folders_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    paths.append(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    with os.scandir(entry.path) as shard_entries:
+                        paths.extend(e.path for e in shard_entries if e.name.endswith(".json"))
+        
+        for folder_data in read_json_files(paths):
+            self._index_add(folder_data)
         
-        # Supprimer les espaces en début/fin
-        path = path.strip()
+        self._mtime_ns = mtime_ns
+    
+    
+    def _folder_file(self, folder_id: str) -> Path:
+        """
+        Chemin du fichier de métadonnées d'un dossier
+        
+        Les fichiers sont répartis dans 256 sous-dossiers selon les deux premiers
+        caractères de l'ID, pour garder chaque répertoire petit.
+        """
+        return self.folders_dir / folder_id[:2] / f"{folder_id}.json"
+    
+    
+    def _stored_folder_file(self, folder_id: str) -> Path:
+        """Chemin du fichier de métadonnées existant d'un dossier (shardé ou ancien format)"""
+        folder_file = self._folder_file(folder_id)
+        if not folder_file.exists():
+            # Dossier créé avant le sharding : fichier à la racine de _folders/
+            legacy_file = self.folders_dir / f"{folder_id}.json"
+            if legacy_file.exists():
+                return legacy_file
+        return folder_file
+    
+    
+    def _touch(self, mtime_before: int):
+        """
+        Met à jour le mtime de folders_dir après une écriture
         
-        # S'assurer que ça commence par /
-        if not path.startswith("/"):
-            path = "/" + path
+        Les écritures ont lieu dans les sous-dossiers de shard : c'est ce mtime
+        qui signale les modifications aux autres processus.
         
-        # Supprimer les doublons de /
-        parts = [p for p in path.split("/") if p]
-        normalized = "/" + "/".join(parts)
+        Le nouveau mtime n'est mémorisé que si l'index était à jour juste avant
+        l'écriture (mtime_before) : sinon il reste périmé et sera rechargé.
         
-        return normalized
+        Args:
+            mtime_before: mtime de folders_dir relevé avant l'écriture
+        """
+        os.utime(self.folders_dir)
+        if mtime_before == self._mtime_ns:
+            self._mtime_ns = os.stat(self.folders_dir).st_mtime_ns
+    
+    
+    def _index_add(self, folder_data: Dict):
+        """Ajoute un dossier à l'index"""
+        self._folders[folder_data['folder_path']] = folder_data
+        self._children.setdefault(folder_data['parent_path'], {})[folder_data['folder_path']] = folder_data
+    
+    
+    def _index_remove(self, folder_data: Dict):
+        """Retire un dossier de l'index"""
+        self._folders.pop(folder_data['folder_path'], None)
+        siblings = self._children.get(folder_data['parent_path'])
+        if siblings is not None:
+            siblings.pop(folder_data['folder_path'], None)
+            if not siblings:
+                del self._children[folder_data['parent_path']]
     
     
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _generate_folder_id(folder_path: str) -> str:
         """Génère un ID unique pour un dossier"""
-        return hashlib.sha256(folder_path.encode()).hexdigest()[:16]
+        return hashlib.blake2s(folder_path.encode(), digest_size=8).hexdigest()
     
     
     @staticmethod
     def _get_timestamp() -> str:
         """Retourne le timestamp ISO 8601"""
-        return datetime.utcnow().isoformat() + 'Z'
+        return utc_timestamp()
 
@@ -1,16 +1,21 @@
 """Gestion des métadonnées de fichiers chiffrés"""
 
-import json
+import os
 import logging
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from .models import FileMetadata, EncryptedChunk
 from .config import KEYS_DIR, ENCRYPTION_ALGORITHM, KEY_SIZE_BITS, NONCE_SIZE_BITS
+from .utils import json_dumps, read_json_file, read_json_files, atomic_write_bytes, utc_timestamp, normalize_path
 
 
 logger = logging.getLogger(__name__)
 
+# Attributs lus sur chaque EncryptedChunk (en C) et clés correspondantes dans les métadonnées
+_CHUNK_FIELDS = attrgetter('chunk_id', 'hash_sha256', 'size', 'index', 'file_path')
+_CHUNK_KEYS = ('chunk_id', 'hash', 'size', 'index', 'file_path')
+
 
 class MetadataManager:
     """Gère la sauvegarde et le chargement des métadonnées"""
@@ -18,13 +23,23 @@ class MetadataManager:
     def __init__(self, keys_dir: Path = KEYS_DIR):
         self.keys_dir = keys_dir
         self.keys_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Index en mémoire (chargé au premier accès) : file_id -> résumé du fichier
+        self._files: Optional[Dict[str, Dict]] = None
+        # Index secondaire : dossier normalisé -> {file_id: résumé}
+        self._by_folder: Dict[str, Dict[str, Dict]] = {}
+        # Signature (mtime_ns, taille) de chaque fichier lors de sa dernière lecture
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        # mtime (ns) de keys_dir lors du dernier chargement de l'index
+        self._mtime_ns: Optional[int] = None
     
     
     def save_metadata(self, file_id: str, original_name: str,
                      original_size: int, encrypted_size: int,
                      key: bytes, nonce: bytes,
                      chunks: List[EncryptedChunk],
-                     folder_path: str = "/") -> FileMetadata:
+                     folder_path: str = "/",
+                     file_id_algorithm: str = "sha256") -> FileMetadata:
         """
         Sauvegarde les métadonnées d'un fichier chiffré
         
@@ -36,10 +51,15 @@ class MetadataManager:
             key: Clé de chiffrement
             nonce: Nonce utilisé
             chunks: Liste des chunks
+            folder_path: Chemin du dossier parent
+            file_id_algorithm: Algorithme de hachage ayant produit le file_id
             
         Returns:
             Objet FileMetadata
         """
+        # Construite une seule fois, partagée par FileMetadata et le document JSON
+        chunk_dicts = [dict(zip(_CHUNK_KEYS, fields)) for fields in map(_CHUNK_FIELDS, chunks)]
+        
         metadata = FileMetadata(
             file_id=file_id,
             original_name=original_name,
@@ -47,39 +67,40 @@ class MetadataManager:
             encrypted_size=encrypted_size,
             key=key.hex(),
             nonce=nonce.hex(),
-            chunks=[
-                {
-                    'chunk_id': c.chunk_id,
-                    'hash': c.hash_sha256,
-                    'size': c.size,
-                    'index': c.index,
-                    'file_path': c.file_path
-                }
-                for c in chunks
-            ],
+            chunks=chunk_dicts,
             created_at=self._get_timestamp(),
-            folder_path=folder_path
+            folder_path=folder_path,
+            file_id_algorithm=file_id_algorithm
         )
         
         metadata_path = self.keys_dir / f"{file_id}.json"
         
-        with open(metadata_path, 'w') as f:
-            json.dump({
-                'file_id': metadata.file_id,
-                'original_name': metadata.original_name,
-                'original_size': metadata.original_size,
-                'encrypted_size': metadata.encrypted_size,
-                'encryption': {
-                    'algorithm': ENCRYPTION_ALGORITHM,
-                    'key': metadata.key,
-                    'nonce': metadata.nonce,
-                    'key_size_bits': KEY_SIZE_BITS,
-                    'nonce_size_bits': NONCE_SIZE_BITS
-                },
-                'chunks': metadata.chunks,
-                'created_at': metadata.created_at,
-                'folder_path': metadata.folder_path
-            }, f, indent=2)
+        # Sérialiser d'abord, puis écrire en un seul appel (json.dump écrit token par token)
+        metadata_data = {
+            'file_id': metadata.file_id,
+            'original_name': metadata.original_name,
+            'original_size': metadata.original_size,
+            'encrypted_size': metadata.encrypted_size,
+            'encryption': {
+                'algorithm': ENCRYPTION_ALGORITHM,
+                'key': metadata.key,
+                'nonce': metadata.nonce,
+                'key_size_bits': KEY_SIZE_BITS,
+                'nonce_size_bits': NONCE_SIZE_BITS
+            },
+            'chunks': chunk_dicts,
+            'created_at': metadata.created_at,
+            'folder_path': metadata.folder_path,
+            'file_id_algorithm': metadata.file_id_algorithm
+        }
+        # JSON compact, indenté seulement en mode debug pour rester lisible
+        data = json_dumps(metadata_data, indent=logger.isEnabledFor(logging.DEBUG))
+        # Écriture atomique et synchronisée : jamais de JSON tronqué, même après un crash
+        mtime_before = os.stat(self.keys_dir).st_mtime_ns
+        atomic_write_bytes(metadata_path, data, fsync=True)
+        
+        self._index_put(metadata_data)
+        self._touch(mtime_before)
         
         logger.info(f"  💾 Métadonnées sauvegardées")
         return metadata
@@ -97,15 +118,15 @@ class MetadataManager:
         """
         metadata_path = self.keys_dir / f"{file_id}.json"
         
-        if not metadata_path.exists():
+        # Pas de vérification exists() préalable : os.open échoue directement
+        try:
+            return read_json_file(metadata_path)
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"❌ Métadonnées introuvables pour {file_id}\n"
                 f"   Chemin: {metadata_path}\n"
                 f"   Ce fichier n'a pas été chiffré sur cet ordinateur."
-            )
-        
-        with open(metadata_path, 'r') as f:
-            return json.load(f)
+            ) from None
     
     
     def list_files(self, folder_path: str = "/") -> List[Dict]:
@@ -115,52 +136,15 @@ class MetadataManager:
         Args:
             folder_path: Chemin du dossier (par défaut "/" pour la racine)
         """
-        files = []
-        folder_path = self._normalize_path(folder_path)
-
-        for metadata_file in self.keys_dir.glob("*.json"):
-            # Ignorer les fichiers de dossiers
-            if metadata_file.parent.name == "_folders":
-                continue
-                
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-                # Filtrer par dossier
-                file_folder = metadata.get('folder_path', '/')
-                if self._normalize_path(file_folder) == folder_path:
-                    files.append({
-                        'file_id': metadata['file_id'],
-                        'original_name': metadata['original_name'],
-                        'file_size': metadata['original_size'],
-                        'chunk_count': len(metadata['chunks']),
-                        'upload_date': metadata['created_at'],
-                        'folder_path': metadata.get('folder_path', '/')
-                    })
-
-        return files
+        folder_path = normalize_path(folder_path)
+        self._index()
+        # Index secondaire par dossier : seuls les fichiers du dossier sont parcourus
+        return [dict(f) for f in self._by_folder.get(folder_path, {}).values()]
     
     
     def list_all_files(self) -> List[Dict]:
         """Liste tous les fichiers chiffrés (tous dossiers confondus)"""
-        files = []
-
-        for metadata_file in self.keys_dir.glob("*.json"):
-            # Ignorer les fichiers de dossiers
-            if metadata_file.parent.name == "_folders":
-                continue
-                
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-                files.append({
-                    'file_id': metadata['file_id'],
-                    'original_name': metadata['original_name'],
-                    'file_size': metadata['original_size'],
-                    'chunk_count': len(metadata['chunks']),
-                    'upload_date': metadata['created_at'],
-                    'folder_path': metadata.get('folder_path', '/')
-                })
-
-        return files
+        return [dict(f) for f in self._index().values()]
         
     
     def get_file_info(self, file_id: str) -> Dict:
@@ -191,50 +175,145 @@ class MetadataManager:
         """
         metadata_path = self.keys_dir / f"{file_id}.json"
         
-        if not metadata_path.exists():
-            raise FileNotFoundError(f"❌ Fichier introuvable: {file_id}")
-        
         # Charger les métadonnées actuelles
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
+        try:
+            metadata = read_json_file(metadata_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"❌ Fichier introuvable: {file_id}") from None
         
         # Normaliser le nouveau chemin
-        new_folder_path = self._normalize_path(new_folder_path)
+        new_folder_path = normalize_path(new_folder_path)
         
         # Mettre à jour le folder_path
         metadata['folder_path'] = new_folder_path
         
         # Sauvegarder les métadonnées mises à jour
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        data = json_dumps(metadata, indent=logger.isEnabledFor(logging.DEBUG))
+        mtime_before = os.stat(self.keys_dir).st_mtime_ns
+        atomic_write_bytes(metadata_path, data, fsync=True)
+        
+        self._index_put(metadata)
+        self._touch(mtime_before)
         
         logger.info(f"  ✅ Chemin du fichier mis à jour: {file_id} -> {new_folder_path}")
         return True
     
     def delete_metadata(self, file_id: str):
         """Supprime les métadonnées d'un fichier"""
+        mtime_before = os.stat(self.keys_dir).st_mtime_ns
         metadata_path = self.keys_dir / f"{file_id}.json"
         
-        if metadata_path.exists():
+        try:
             metadata_path.unlink()
-            logger.info(f"  ✅ Métadonnées supprimées")
-        else:
+        except FileNotFoundError:
             logger.warning(f"  ⚠️  Métadonnées introuvables")
+            return
+        
+        if self._files is not None:
+            self._index_remove(file_id)
+        self._touch(mtime_before)
+        logger.info(f"  ✅ Métadonnées supprimées")
     
     
-    @staticmethod
-    def _get_timestamp() -> str:
-        """Retourne le timestamp ISO 8601"""
-        return datetime.utcnow().isoformat() + 'Z'
+    def _index(self) -> Dict[str, Dict]:
+        """Retourne l'index file_id -> résumé, à jour avec le disque"""
+        mtime_ns = os.stat(self.keys_dir).st_mtime_ns
+        if self._files is None or mtime_ns != self._mtime_ns:
+            self._refresh(mtime_ns)
+        return self._files
+    
+    
+    def _refresh(self, mtime_ns: int):
+        """
+        Met à jour l'index en ne relisant que les fichiers nouveaux ou modifiés
+        
+        Un seul parcours de keys_dir fournit la signature de chaque fichier :
+        les fichiers inchangés depuis leur dernière lecture ne sont pas rouverts.
+        """
+        if self._files is None:
+            self._files = {}
+        
+        stamps = {}
+        changed = []
+        with os.scandir(self.keys_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                st = entry.stat()
+                file_id = entry.name[:-5]
+                stamps[file_id] = (st.st_mtime_ns, st.st_size)
+                if file_id not in self._files or self._stamps.get(file_id) != stamps[file_id]:
+                    changed.append(entry.path)
+        
+        # Fichiers supprimés depuis le dernier chargement
+        for file_id in self._files.keys() - stamps.keys():
+            self._index_remove(file_id)
+        
+        # Lectures réparties sur un pool de threads quand elles sont nombreuses ;
+        # un fichier illisible est ignoré plutôt que d'interrompre tout le listage
+        for path, metadata in zip(changed, read_json_files(changed, skip_errors=True)):
+            if metadata is None:
+                logger.warning(f"  ⚠️  Métadonnées illisibles ignorées: {os.path.basename(path)}")
+                continue
+            self._index_put(metadata)
+        
+        self._stamps = stamps
+        self._mtime_ns = mtime_ns
+    
+    
+    def _index_put(self, metadata: Dict):
+        """Ajoute ou remplace un fichier dans l'index (s'il est chargé)"""
+        if self._files is None:
+            return
+        file_id = metadata['file_id']
+        summary = {
+            'file_id': file_id,
+            'original_name': metadata['original_name'],
+            'file_size': metadata['original_size'],
+            'chunk_count': len(metadata['chunks']),
+            'upload_date': metadata['created_at'],
+            'folder_path': metadata.get('folder_path', '/')
+        }
+        if file_id in self._files:
+            # Le fichier a pu changer de dossier
+            self._index_remove(file_id)
+        self._files[file_id] = summary
+        self._by_folder.setdefault(normalize_path(summary['folder_path']), {})[file_id] = summary
+    
+    
+    def _index_remove(self, file_id: str):
+        """Retire un fichier de l'index"""
+        summary = self._files.pop(file_id, None)
+        if summary is None:
+            return
+        folder_path = normalize_path(summary['folder_path'])
+        siblings = self._by_folder.get(folder_path)
+        if siblings is not None:
+            siblings.pop(file_id, None)
+            if not siblings:
+                del self._by_folder[folder_path]
+    
+    
+    def _touch(self, mtime_before: int):
+        """
+        Met à jour le mtime de keys_dir après une écriture
+        
+        La réécriture d'un fichier existant ne modifie pas le mtime du
+        répertoire : c'est ce mtime qui signale les modifications aux autres processus.
+        
+        Le nouveau mtime n'est mémorisé que si l'index était à jour juste avant
+        l'écriture (mtime_before) : si un autre processus a écrit entre-temps,
+        l'index reste périmé et sera rechargé au prochain accès.
+        
+        Args:
+            mtime_before: mtime de keys_dir relevé avant l'écriture
+        """
+        os.utime(self.keys_dir)
+        if mtime_before == self._mtime_ns:
+            self._mtime_ns = os.stat(self.keys_dir).st_mtime_ns
     
     
     @staticmethod
-    def _normalize_path(path: str) -> str:
-        """Normalise un chemin"""
-        if not path:
-            return "/"
-        path = path.strip()
-        if not path.startswith("/"):
-            path = "/" + path
-        parts = [p for p in path.split("/") if p]
-        return "/" + "/".join(parts)
+    def _get_timestamp() -> str:
+        """Retourne le timestamp ISO 8601"""
+        return utc_timestamp()
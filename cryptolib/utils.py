@@ -1,5 +1,49 @@
 """Fonctions utilitaires pour le système de chiffrement"""
 
+import os
+import hmac
+import mmap
+import json
+import time
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+import blake3
+
+try:
+    import orjson
+except ImportError:
+    # orjson est optionnel : repli sur le module json standard
+    orjson = None
+
+
+# Algorithme utilisé pour générer les nouveaux file_id (les anciens restent en SHA-256)
+FILE_ID_ALGORITHM = "blake3"
+
+# Drapeaux d'ouverture en lecture seule (O_BINARY n'existe que sous Windows)
+_O_RDONLY = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+# Drapeaux d'ouverture en écriture (création ou remplacement du contenu)
+_O_WRONLY = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+# Drapeaux de création exclusive (échoue si le fichier existe déjà)
+_O_WRONLY_EXCL = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
+
+# En dessous de ce nombre de fichiers, un pool de threads coûte plus qu'il ne rapporte
+PARALLEL_IO_MIN_FILES = 32
+
+# Au-delà de cette taille, les JSON sont mappés en mémoire et parsés sans copie
+# (en dessous, un seul os.read coûte moins que la mise en place du mapping)
+MMAP_JSON_MIN_SIZE = 64 * 1024
+
+# Unités de format_size, par puissance de 1024
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# (seconde, "YYYY-MM-DDTHH:MM:SS") de la dernière seconde formatée
+_timestamp_cache = (None, "")
+
 
 def format_size(size_bytes: int) -> str:
     """
@@ -11,9 +55,271 @@ def format_size(size_bytes: int) -> str:
     Returns:
         Chaîne formatée (ex: "1.23 MB")
     """
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} TB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
+    
+    # Puissance de 1024 déduite du nombre de bits, sans boucle de divisions
+    exp = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (exp * 10)):.2f} {_SIZE_UNITS[exp]}"
+
+
+@lru_cache(maxsize=1024)
+def normalize_path(path: str) -> str:
+    """
+    Normalise un chemin de dossier virtuel (supprime les doublons de /, etc.)
+    
+    Le résultat est mis en cache : les mêmes quelques chemins reviennent sans cesse.
+    
+    Args:
+        path: Chemin à normaliser (ex: "Documents//Projets/")
+        
+    Returns:
+        Chemin normalisé (ex: "/Documents/Projets", "/" pour la racine)
+    """
+    if not path:
+        return "/"
+    
+    # Chemin déjà normalisé (cas le plus courant) : rien à allouer
+    if path[0] == "/" and path[-1] != "/" and not path[-1].isspace() and "//" not in path:
+        return path
+    
+    # Supprimer les espaces en début/fin et forcer le / initial
+    normalized = "/" + path.strip()
+    
+    # Fusionner les doublons de / (str.replace s'exécute en C)
+    while "//" in normalized:
+        normalized = normalized.replace("//", "/")
+    
+    return normalized.rstrip("/") or "/"
 
+
+def json_loads(data):
+    """
+    Désérialise un document JSON (via orjson si disponible, ~5x plus rapide)
+    
+    Args:
+        data: Contenu JSON (bytes ou str)
+        
+    Returns:
+        Objet Python décodé
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def new_hasher(algorithm: str):
+    """
+    Crée un objet de hachage incrémental (update / digest / hexdigest)
+    
+    Args:
+        algorithm: "blake3" ou un nom d'algorithme hashlib (ex: "sha256")
+        
+    Returns:
+        Objet de hachage
+    """
+    if algorithm == "blake3":
+        # Hachage en arbre : BLAKE3 répartit les gros volumes sur plusieurs cœurs
+        return blake3.blake3(max_threads=blake3.blake3.AUTO)
+    return hashlib.new(algorithm)
+
+
+def digest_matches(digest: bytes, expected_hex: str) -> bool:
+    """
+    Compare un condensat brut à sa valeur hexadécimale attendue
+    
+    La comparaison se fait sur les octets (pas d'encodage hex du condensat
+    calculé) et en temps constant via hmac.compare_digest.
+    
+    Args:
+        digest: Condensat calculé (ou son préfixe)
+        expected_hex: Valeur attendue en hexadécimal
+        
+    Returns:
+        True si les valeurs sont identiques
+    """
+    try:
+        expected = bytes.fromhex(expected_hex)
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """Lit tout le contenu d'un descripteur dont la taille attendue est size"""
+    data = os.read(fd, size + 1)
+    if len(data) != size:
+        # Lecture courte ou fichier modifié depuis le fstat : lire jusqu'à EOF
+        parts = [data]
+        while chunk := os.read(fd, 65536):
+            parts.append(chunk)
+        data = b"".join(parts)
+    return data
+
+
+def write_file_bytes(path, data: bytes, fsync: bool = False, exclusive: bool = False):
+    """
+    Écrit un fichier entier via os.open/os.write
+    
+    Les octets sont passés directement au noyau, sans objet fichier
+    bufferisé ni copie intermédiaire.
+    
+    Args:
+        path: Chemin du fichier
+        data: Contenu à écrire
+        fsync: Si True, force l'écriture sur disque avant de rendre la main
+        exclusive: Si True, le fichier est créé et ne doit pas déjà exister
+    """
+    fd = os.open(path, _O_WRONLY_EXCL if exclusive else _O_WRONLY, 0o666)
+    try:
+        with memoryview(data) as view:
+            written = os.write(fd, view)
+            while written < len(view):
+                # Écriture partielle : continuer là où le noyau s'est arrêté
+                written += os.write(fd, view[written:])
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_json_file(path) -> dict:
+    """
+    Lit et désérialise un fichier JSON
+    
+    Args:
+        path: Chemin du fichier
+        
+    Returns:
+        Contenu décodé
+    """
+    fd = os.open(path, _O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if orjson is not None and size >= MMAP_JSON_MIN_SIZE:
+            # orjson parse directement le mapping : pas de copie en bytes du fichier.
+            # Les fichiers sont remplacés par os.replace, jamais tronqués en place.
+            with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return orjson.loads(view)
+        return json_loads(_read_fd(fd, size))
+    finally:
+        os.close(fd)
+
+
+def _read_json_file_or_none(path) -> Optional[dict]:
+    """Lit un fichier JSON, retourne None s'il a disparu ou est illisible"""
+    try:
+        return read_json_file(path)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_json_files(paths: List[str], max_workers: int = 8, skip_errors: bool = False) -> List[Optional[dict]]:
+    """
+    Lit et désérialise plusieurs fichiers JSON, en parallèle s'ils sont nombreux
+    
+    Le GIL est relâché pendant les lectures disque et le parsing orjson :
+    les threads recouvrent les latences d'E/S.
+    
+    Args:
+        paths: Chemins des fichiers
+        max_workers: Nombre maximal de threads
+        skip_errors: Si True, un fichier disparu ou au JSON invalide donne None
+            au lieu d'interrompre toute la lecture
+        
+    Returns:
+        Contenus décodés, dans l'ordre de paths
+    """
+    reader = _read_json_file_or_none if skip_errors else read_json_file
+    if len(paths) < PARALLEL_IO_MIN_FILES:
+        return [reader(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(reader, paths))
+
+
+def _unlink_if_exists(path) -> bool:
+    """Supprime un fichier, retourne False s'il n'existait pas"""
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def unlink_files(paths: List, max_workers: int = 8) -> List[bool]:
+    """
+    Supprime plusieurs fichiers, en parallèle s'ils sont nombreux
+    
+    Args:
+        paths: Chemins des fichiers
+        max_workers: Nombre maximal de threads
+        
+    Returns:
+        Pour chaque chemin (dans l'ordre de paths), True si le fichier existait
+    """
+    if len(paths) < PARALLEL_IO_MIN_FILES:
+        return [_unlink_if_exists(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_unlink_if_exists, paths))
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Sérialise un objet en JSON encodé en UTF-8 (via orjson si disponible)
+    
+    Args:
+        obj: Objet à sérialiser
+        indent: Si True, indente de 2 espaces au lieu du format compact
+        
+    Returns:
+        Document JSON (bytes)
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(obj)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def atomic_write_bytes(path, data: bytes, fsync: bool = False):
+    """
+    Écrit un fichier de manière atomique (fichier temporaire + os.replace)
+    
+    Un lecteur concurrent voit soit l'ancien contenu, soit le nouveau,
+    jamais un fichier partiellement écrit.
+    
+    Args:
+        path: Chemin du fichier de destination
+        data: Contenu à écrire
+        fsync: Si True, le contenu est sur disque avant le remplacement
+            (un crash ne peut pas laisser un fichier vide ou tronqué)
+    """
+    path = os.fspath(path)
+    # Temporaire propre à chaque écriture (PID + suffixe aléatoire) : deux écrivains
+    # concurrents du même fichier ne se partagent jamais le même fichier temporaire
+    tmp_path = f"{path}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+    try:
+        write_file_bytes(tmp_path, data, fsync=fsync, exclusive=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Ne pas laisser de temporaire orphelin après un échec
+        _unlink_if_exists(tmp_path)
+        raise
+
+
+def utc_timestamp() -> str:
+    """
+    Retourne le timestamp ISO 8601 UTC courant (ex: 2025-01-01T12:00:00.123456Z)
+    
+    La partie date/heure n'est formatée qu'une fois par seconde, seules les
+    microsecondes sont recalculées à chaque appel.
+    """
+    global _timestamp_cache
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_seconds, prefix = _timestamp_cache
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    return f"{prefix}.{micros:06d}Z"
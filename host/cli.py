@@ -4,27 +4,40 @@ Script CLI pour gérer le serveur MeshDrive (Host)
 """
 
 import typer
-import json
 import sys
 import subprocess
 import signal
 import os
+import io
 import time
+import select
+import struct
+import ctypes
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    # inotify_simple est optionnel (Linux uniquement) : logs --follow sonde le fichier
+    INotify = None
 
 # Ajouter le répertoire parent au path pour importer cryptolib
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from cryptolib import CryptoSystem
 from cryptolib.config import KEYS_DIR, CHUNKS_DIR
+from cryptolib.utils import json_loads, json_dumps, atomic_write_bytes
 
 app = typer.Typer(help="🔐 MeshDrive Host CLI - Gestion du serveur de stockage")
 
-# Obtenir le répertoire du projet (parent de host/)
-PROJECT_ROOT = Path(__file__).parent.parent
+# Répertoire du host et du projet (parent de host/), calculés une seule fois
+HOST_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = HOST_DIR.parent
 
 # Variables globales pour le mode test
 TEST_MODE = False
@@ -32,23 +45,46 @@ TEST_MODE = False
 # Configuration par défaut
 def get_config_file():
     """Retourne le chemin du fichier de configuration selon le mode"""
-    if TEST_MODE:
-        return Path(__file__).parent / "host_config.test.json"
-    return Path(__file__).parent / "host_config.json"
+    return _config_path(TEST_MODE)
+
+
+@lru_cache(maxsize=2)
+def _config_path(test_mode: bool) -> Path:
+    """Chemin du fichier de configuration (calculé une fois par mode)"""
+    return HOST_DIR / ("host_config.test.json" if test_mode else "host_config.json")
+
+
+@lru_cache(maxsize=2)
+def _pid_path(test_mode: bool) -> Path:
+    """Chemin du fichier PID du serveur (calculé une fois par mode)"""
+    return HOST_DIR / (".server.test.pid" if test_mode else ".server.pid")
+
+
+@lru_cache(maxsize=2)
+def _log_path(test_mode: bool) -> Path:
+    """Chemin du fichier de logs du serveur (calculé une fois par mode)"""
+    return HOST_DIR / ("host.test.log" if test_mode else "host.log")
 
 CONFIG_FILE = get_config_file()
-PID_FILE = Path(__file__).parent / (".server.test.pid" if TEST_MODE else ".server.pid")
-LOG_FILE = Path(__file__).parent / ("host.test.log" if TEST_MODE else "host.log")
+PID_FILE = _pid_path(TEST_MODE)
+LOG_FILE = _log_path(TEST_MODE)
 
 # Configuration par défaut
 def get_default_config():
     """Retourne la configuration par défaut selon le mode"""
-    if TEST_MODE:
+    # Copie : les appelants modifient la configuration retournée
+    return dict(_default_config(TEST_MODE))
+
+
+@lru_cache(maxsize=2)
+def _default_config(test_mode: bool) -> dict:
+    """Configuration par défaut (construite une fois par mode)"""
+    if test_mode:
         return {
             "host": "0.0.0.0",
             "port": 8001,  # Port différent pour les tests
-            "keys_dir": str((PROJECT_ROOT / "test_keys").absolute()),
-            "chunks_dir": str((PROJECT_ROOT / "test_output").absolute()),
+            "keys_dir": str(PROJECT_ROOT / "test_keys"),
+            "chunks_dir": str(PROJECT_ROOT / "test_output"),
             "chunk_size": 1024 * 1024,  # 1 MB
             "reload": True,
             "log_level": "info"
@@ -56,8 +92,8 @@ def get_default_config():
     return {
         "host": "0.0.0.0",
         "port": 8000,
-        "keys_dir": str((PROJECT_ROOT / "keys").absolute()),
-        "chunks_dir": str((PROJECT_ROOT / "output").absolute()),
+        "keys_dir": str(PROJECT_ROOT / "keys"),
+        "chunks_dir": str(PROJECT_ROOT / "output"),
         "chunk_size": 1024 * 1024,  # 1 MB
         "reload": True,
         "log_level": "info"
@@ -68,64 +104,234 @@ DEFAULT_CONFIG = get_default_config()
 
 def load_config():
     """Charge la configuration depuis le fichier"""
+    return _load_config_with_status()[0]
+
+
+def _load_config_with_status():
+    """
+    Charge la configuration et indique si elle provient du fichier
+    
+    Returns:
+        (config, loaded) : loaded est False si le fichier est absent ou illisible
+        (config contient alors les valeurs par défaut)
+    """
     config_file = get_config_file()
+    try:
+        mtime_ns = config_file.stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    config, loaded = _load_config_cached(config_file, mtime_ns)
+    # Copie : les appelants modifient la configuration retournée
+    return dict(config), loaded
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(config_file: Path, mtime_ns: Optional[int]):
+    """
+    Lit et fusionne la configuration, une seule fois par version du fichier
+    
+    Le mtime fait partie de la clé du cache : un fichier modifié est relu.
+    """
     default_config = get_default_config()
     
-    if config_file.exists():
+    if mtime_ns is not None:
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                # Fusionner avec les valeurs par défaut
-                final_config = default_config.copy()
-                final_config.update(config)
-                return final_config
+            config = json_loads(config_file.read_bytes())
+            # Fusionner avec les valeurs par défaut
+            final_config = default_config.copy()
+            final_config.update(config)
+            return final_config, True
         except Exception as e:
             print(f"⚠️  Erreur lors du chargement de la config: {e}")
-            return default_config
-    return default_config.copy()
+            return default_config, False
+    return default_config, False
 
 
 def save_config(config: dict):
     """Sauvegarde la configuration dans le fichier"""
     config_file = get_config_file()
     config_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    # Écriture atomique : un crash ne peut pas laisser une configuration tronquée
+    atomic_write_bytes(config_file, json_dumps(config, indent=True), fsync=True)
+    _load_config_cached.cache_clear()
     print(f"✅ Configuration sauvegardée dans {config_file}")
 
 
 def get_server_pid():
     """Récupère le PID du serveur s'il est en cours d'exécution"""
-    pid_file = Path(__file__).parent / (".server.test.pid" if TEST_MODE else ".server.pid")
-    if pid_file.exists():
-        try:
-            with open(pid_file, 'r') as f:
-                pid = int(f.read().strip())
-                # Vérifier si le processus existe toujours
-                try:
-                    os.kill(pid, 0)  # Vérifie si le processus existe
-                    return pid
-                except OSError:
-                    # Le processus n'existe plus
-                    pid_file.unlink()
-                    return None
-        except Exception:
-            return None
+    pid_file = _pid_path(TEST_MODE)
+    try:
+        fd = os.open(pid_file, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    except OSError:
+        return None
+    try:
+        # Un PID tient sur quelques chiffres : une seule lecture suffit
+        pid = int(os.pread(fd, 12, 0) if hasattr(os, "pread") else os.read(fd, 12))
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+    
+    # Vérifier si le processus existe toujours
+    if _process_exists(pid):
+        return pid
+    # Le processus n'existe plus
+    try:
+        pid_file.unlink()
+    except OSError:
+        pass
     return None
 
 
+def _process_exists(pid: int) -> bool:
+    """Vérifie si un processus existe (pidfd_open si disponible, sinon kill(pid, 0))"""
+    if hasattr(os, "pidfd_open"):
+        try:
+            os.close(os.pidfd_open(pid))
+            return True
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # pidfd non supporté par le noyau : vérification classique
+            pass
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def format_size(size_bytes: int) -> str:
     """Formate une taille en bytes en format lisible"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} PB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
+    # Puissance de 1024 déduite du nombre de bits, sans boucle de divisions
+    exp = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (exp * 10)):.2f} {_SIZE_UNITS[exp]}"
+
+
+# statx(AT_STATX_DONT_SYNC) via la libc (Linux, glibc >= 2.28) : la taille est lue
+# depuis les attributs en cache, sans aller-retour serveur sur NFS
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_SIZE = 0x200
+_STATX_BUF_SIZE = 256
+_STATX_SIZE_OFFSET = 40  # struct statx : champ stx_size (u64)
+
+_statx = None
+if sys.platform == "linux":
+    try:
+        _statx = ctypes.CDLL(None, use_errno=True).statx
+        _statx.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.c_void_p)
+        _statx.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _statx = None
 
 
-def get_storage_stats():
-    """Calcule les statistiques du stockage"""
-    config = load_config()
+def _cached_size(entry: os.DirEntry) -> int:
+    """
+    Taille d'un fichier, depuis les attributs en cache du noyau si possible
+    
+    Suffisant pour un affichage de statistiques : sur un montage réseau, évite
+    de revalider les métadonnées de chaque fichier auprès du serveur.
+    """
+    if _statx is not None:
+        buf = ctypes.create_string_buffer(_STATX_BUF_SIZE)
+        if _statx(_AT_FDCWD, os.fsencode(entry.path), _AT_STATX_DONT_SYNC, _STATX_SIZE, buf) == 0:
+            return struct.unpack_from("=Q", buf, _STATX_SIZE_OFFSET)[0]
+    return entry.stat().st_size
+
+
+def _entry_size(entry: os.DirEntry) -> Optional[int]:
+    """Taille d'un fichier, None s'il a été supprimé depuis la lecture du répertoire"""
+    try:
+        return _cached_size(entry)
+    except FileNotFoundError:
+        return None
+
+
+def _scan_files(root: Path, suffix: str):
+    """
+    Parcourt récursivement root (os.scandir) et produit la taille de chaque
+    fichier dont le nom se termine par suffix
+    
+    Le type des entrées vient directement de la lecture du répertoire :
+    seule la taille demande un stat par fichier.
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            # Répertoire supprimé pendant le parcours
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix) and entry.is_file():
+                    # Un fichier supprimé entre-temps est ignoré, pas le reste du répertoire
+                    size = _entry_size(entry)
+                    if size is not None:
+                        yield size
+
+
+def _count_subtree(root: str, suffix: str = ".enc"):
+    """Retourne (nombre, taille totale) des fichiers suffix sous root"""
+    count = 0
+    total_size = 0
+    for size in _scan_files(root, suffix):
+        count += 1
+        total_size += size
+    return count, total_size
+
+
+def _count_folder_files(folders_dir: str):
+    """
+    Retourne (nombre, taille totale) des fichiers de dossiers
+    
+    Les dossiers sont rangés dans _folders/XX/<folder_id>.json ; les fichiers
+    créés avant le sharding sont à la racine de _folders/. Aucun niveau plus
+    profond n'existe, il n'est donc pas parcouru.
+    """
+    count = 0
+    total_size = 0
+    with os.scandir(folders_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    shard_entries = os.scandir(entry.path)
+                except FileNotFoundError:
+                    # Shard supprimé pendant le parcours
+                    continue
+                with shard_entries:
+                    for shard_entry in shard_entries:
+                        if shard_entry.name.endswith(".json") and shard_entry.is_file():
+                            size = _entry_size(shard_entry)
+                            if size is not None:
+                                count += 1
+                                total_size += size
+            elif entry.name.endswith(".json") and entry.is_file():
+                size = _entry_size(entry)
+                if size is not None:
+                    count += 1
+                    total_size += size
+    return count, total_size
+
+
+def get_storage_stats(config: Optional[dict] = None):
+    """
+    Calcule les statistiques du stockage
+    
+    Args:
+        config: Configuration déjà chargée (relue depuis le disque si None)
+    """
+    if config is None:
+        config = load_config()
     keys_dir = Path(config["keys_dir"])
     chunks_dir = Path(config["chunks_dir"])
     
@@ -140,26 +346,40 @@ def get_storage_stats():
         "folders_count": 0
     }
     
-    # Taille et nombre de fichiers dans keys/
+    # Taille et nombre de fichiers dans keys/ : métadonnées à la racine,
+    # dossiers dans _folders/ (seules arborescences possibles)
     if keys_dir.exists():
-        for file_path in keys_dir.rglob("*.json"):
-            if file_path.is_file():
-                stats["files_count"] += 1
-                stats["keys_size"] += file_path.stat().st_size
-        
-        # Compter les dossiers
-        folders_dir = keys_dir / "_folders"
-        if folders_dir.exists():
-            for folder_file in folders_dir.glob("*.json"):
-                if folder_file.is_file():
-                    stats["folders_count"] += 1
-    
-    # Taille et nombre de chunks dans output/
+        with os.scandir(keys_dir) as entries:
+            for entry in entries:
+                if entry.name == "_folders" and entry.is_dir(follow_symlinks=False):
+                    count, size = _count_folder_files(entry.path)
+                    stats["folders_count"] += count
+                    stats["keys_size"] += size
+                elif entry.name.endswith(".json") and entry.is_file():
+                    size = _entry_size(entry)
+                    if size is not None:
+                        stats["files_count"] += 1
+                        stats["keys_size"] += size
+    
+    # Taille et nombre de chunks dans output/ : les chunks de premier niveau sont
+    # comptés directement, les sous-dossiers sont parcourus en parallèle
     if chunks_dir.exists():
-        for chunk_file in chunks_dir.rglob("*.enc"):
-            if chunk_file.is_file():
-                stats["chunks_count"] += 1
-                stats["chunks_size"] += chunk_file.stat().st_size
+        subdirs = []
+        with os.scandir(chunks_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".enc") and entry.is_file():
+                    size = _entry_size(entry)
+                    if size is not None:
+                        stats["chunks_count"] += 1
+                        stats["chunks_size"] += size
+        if subdirs:
+            max_workers = min(32, (os.cpu_count() or 1) * 4, len(subdirs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for count, size in executor.map(_count_subtree, subdirs):
+                    stats["chunks_count"] += count
+                    stats["chunks_size"] += size
     
     stats["total_size"] = stats["keys_size"] + stats["chunks_size"]
     return stats
@@ -185,7 +405,8 @@ def start(
         print("   Utilisez 'meshdrive-host stop' pour l'arrêter")
         raise typer.Exit(1)
     
-    config = load_config()
+    config, loaded = _load_config_with_status()
+    original = dict(config)
     
     # Appliquer les paramètres en ligne de commande
     if host:
@@ -195,7 +416,9 @@ def start(
     if reload is not None:
         config["reload"] = reload
     
-    save_config(config)
+    # N'écrire la configuration que si elle a changé (ou si le fichier est absent ou illisible)
+    if config != original or not loaded:
+        save_config(config)
     
     # Vérifier que les répertoires existent
     keys_dir = Path(config["keys_dir"])
@@ -215,14 +438,16 @@ def start(
         "api.crypto_api:app",
         "--host", config["host"],
         "--port", str(config["port"]),
-        "--log-level", config["log_level"]
+        "--log-level", config["log_level"],
+        # io_uring (uringcore) si disponible, sinon uvloop / asyncio
+        "--loop", "api.event_loop:new_event_loop"
     ]
     
     if config["reload"]:
         cmd.append("--reload")
     
-    log_file_path = Path(__file__).parent / ("host.test.log" if TEST_MODE else "host.log")
-    pid_file_path = Path(__file__).parent / (".server.test.pid" if TEST_MODE else ".server.pid")
+    log_file_path = _log_path(TEST_MODE)
+    pid_file_path = _pid_path(TEST_MODE)
     
     if background:
         # Démarrer en arrière-plan
@@ -249,6 +474,44 @@ def start(
             print("\n🛑 Arrêt du serveur...")
 
 
+def _open_pidfd(pid: int) -> Optional[int]:
+    """Ouvre un pidfd sur un processus (Linux ≥ 5.3), None si indisponible"""
+    if not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
+
+
+def _wait_for_exit(pid: int, timeout: float, pid_fd: Optional[int] = None) -> bool:
+    """
+    Attend la fin d'un processus, au plus timeout secondes
+    
+    Avec un pidfd, le noyau réveille l'attente dès la fin du processus ;
+    sinon, sondage avec un délai croissant (10 ms, 20 ms, ... 500 ms).
+    
+    Returns:
+        True si le processus s'est terminé
+    """
+    if pid_fd is not None:
+        readable, _, _ = select.select([pid_fd], [], [], timeout)
+        return bool(readable)
+    
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while True:
+        try:
+            os.kill(pid, 0)
+        except OSError:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.5)
+
+
 @app.command()
 def stop(
     test: bool = typer.Option(False, "--test", help="Arrêter le serveur en mode test")
@@ -266,26 +529,28 @@ def stop(
     try:
         mode_str = "TEST" if TEST_MODE else "PRODUCTION"
         print(f"🛑 Arrêt du serveur {mode_str} (PID: {pid})...")
-        os.kill(pid, signal.SIGTERM)
-        
-        # Attendre un peu pour que le processus se termine proprement
-        time.sleep(2)
-        
-        # Vérifier si le processus existe encore
+        # pidfd ouvert avant le signal : l'attente porte bien sur ce processus
+        pid_fd = _open_pidfd(pid)
         try:
-            os.kill(pid, 0)
-            # Si on arrive ici, le processus existe encore, on force l'arrêt
+            os.kill(pid, signal.SIGTERM)
+            
+            # Attendre (au plus 2 s) que le processus se termine proprement
+            exited = _wait_for_exit(pid, 2.0, pid_fd)
+        finally:
+            if pid_fd is not None:
+                os.close(pid_fd)
+        
+        if not exited:
+            # Le processus existe encore, on force l'arrêt
             print("⚠️  Le serveur ne répond pas, arrêt forcé...")
             os.kill(pid, signal.SIGKILL)
-        except OSError:
-            pass  # Le processus s'est arrêté
         
-        pid_file_path = Path(__file__).parent / (".server.test.pid" if TEST_MODE else ".server.pid")
+        pid_file_path = _pid_path(TEST_MODE)
         pid_file_path.unlink()
         print("✅ Serveur arrêté")
     except ProcessLookupError:
         print("⚠️  Le processus n'existe plus")
-        pid_file_path = Path(__file__).parent / (".server.test.pid" if TEST_MODE else ".server.pid")
+        pid_file_path = _pid_path(TEST_MODE)
         pid_file_path.unlink()
     except Exception as e:
         print(f"❌ Erreur lors de l'arrêt: {e}")
@@ -334,7 +599,8 @@ def stats(
     mode_str = "🧪 TEST" if TEST_MODE else "🚀 PRODUCTION"
     print(f"📈 Statistiques du stockage MeshDrive ({mode_str})\n")
     
-    stats = get_storage_stats()
+    config = load_config()
+    stats = get_storage_stats(config)
     
     print(f"📁 Dossier clés: {stats['keys_dir']}")
     print(f"   Fichiers: {stats['files_count']}")
@@ -407,6 +673,78 @@ def config(
         print(f"✅ {key}: {old_value} → {new_value}")
 
 
+def _tail(path: Path, n: int):
+    """
+    Retourne les n dernières lignes d'un fichier et sa taille au moment de la lecture
+    
+    Le fichier est lu à rebours par blocs de 64 Ko jusqu'à avoir assez de lignes :
+    la mémoire utilisée ne dépend pas de la taille du log.
+    """
+    block_size = 64 * 1024
+    blocks = []
+    # Fins de ligne universelles (\n, \r, \r\n) : le plus grand des deux
+    # comptes est un minorant du nombre de lignes, on ne s'arrête jamais trop tôt
+    line_feeds = 0
+    carriage_returns = 0
+    
+    with open(path, 'rb') as f:
+        end_offset = os.fstat(f.fileno()).st_size
+        if hasattr(os, "posix_fadvise"):
+            # Accès ciblé à la fin du fichier : pas de lecture anticipée
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_RANDOM)
+        
+        offset = end_offset
+        # n <= 0 : tout le fichier, comme le slicing [-n:] d'origine
+        while offset > 0 and (n <= 0 or max(line_feeds, carriage_returns) <= n):
+            step = min(block_size, offset)
+            offset -= step
+            f.seek(offset)
+            block = f.read(step)
+            blocks.append(block)
+            line_feeds += block.count(b"\n")
+            carriage_returns += block.count(b"\r")
+    
+    data = b"".join(reversed(blocks)).decode('utf-8', 'ignore')
+    # Même découpage que readlines() en mode texte (splitlines() coupe aussi sur \f, \x85, \u2028...)
+    return io.StringIO(data, newline=None).readlines()[-n:], end_offset
+
+
+def _follow_log(f, log_file_path: Path):
+    """
+    Affiche les lignes ajoutées au log au fur et à mesure (comme tail -f)
+    
+    Avec inotify, le processus dort jusqu'à la prochaine écriture au lieu de
+    se réveiller toutes les 100 ms ; sans inotify_simple, repli sur le sondage.
+    """
+    if INotify is None:
+        while True:
+            line = f.readline()
+            if line:
+                print(line.rstrip())
+            else:
+                time.sleep(0.1)
+    
+    rotated_flags = inotify_flags.MOVE_SELF | inotify_flags.DELETE_SELF
+    with INotify() as inotify:
+        inotify.add_watch(log_file_path, inotify_flags.MODIFY | rotated_flags)
+        try:
+            while True:
+                while line := f.readline():
+                    print(line.rstrip())
+                
+                if any(event.mask & rotated_flags for event in inotify.read()):
+                    # Rotation : finir l'ancien fichier puis suivre le nouveau
+                    while line := f.readline():
+                        print(line.rstrip())
+                    f.close()
+                    while not log_file_path.exists():
+                        time.sleep(0.1)
+                    f = open(log_file_path, 'r', encoding='utf-8', errors='ignore')
+                    inotify.add_watch(log_file_path, inotify_flags.MODIFY | rotated_flags)
+        finally:
+            f.close()
+
+
 @app.command()
 def logs(
     lines: int = typer.Option(50, "--lines", "-n", help="Nombre de lignes à afficher"),
@@ -418,36 +756,37 @@ def logs(
     if test:
         TEST_MODE = True
     
-    log_file_path = Path(__file__).parent / ("host.test.log" if TEST_MODE else "host.log")
+    log_file_path = _log_path(TEST_MODE)
     
     if not log_file_path.exists():
         print("ℹ️  Aucun fichier de log trouvé")
         return
     
+    # Afficher les dernières lignes (sans lire tout le fichier)
+    last_lines, end_offset = _tail(log_file_path, lines)
+    for line in last_lines:
+        print(line.rstrip())
+    
     if follow:
         # Suivre les logs en temps réel (comme tail -f)
         try:
             with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                # Lire les dernières lignes
-                all_lines = f.readlines()
-                for line in all_lines[-lines:]:
-                    print(line.rstrip())
+                # Reprendre exactement là où la lecture des dernières lignes s'est arrêtée
+                f.seek(end_offset)
                 
                 # Attendre les nouvelles lignes
-                while True:
-                    line = f.readline()
-                    if line:
-                        print(line.rstrip())
-                    else:
-                        time.sleep(0.1)
+                _follow_log(f, log_file_path)
         except KeyboardInterrupt:
             print("\n🛑 Arrêt de la surveillance des logs")
-    else:
-        # Afficher les dernières lignes
-        with open(log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            all_lines = f.readlines()
-            for line in all_lines[-lines:]:
-                print(line.rstrip())
+
+
+def _unlink_chunk(path: str) -> Optional[Exception]:
+    """Supprime un chunk, retourne l'erreur éventuelle au lieu de la lever"""
+    try:
+        os.unlink(path)
+        return None
+    except Exception as e:
+        return e
 
 
 @app.command()
@@ -468,22 +807,31 @@ def clean(
     print("🧹 Nettoyage des fichiers orphelins...\n")
     
     # Récupérer tous les file_ids des métadonnées
+    # (un seul scandir : le nom suffit, le type vient de l'entrée de répertoire)
     valid_file_ids = set()
     if keys_dir.exists():
-        for metadata_file in keys_dir.glob("*.json"):
-            if metadata_file.stem != "_folders":
-                valid_file_ids.add(metadata_file.stem)
+        with os.scandir(keys_dir) as entries:
+            valid_file_ids = {
+                entry.name[:-5] for entry in entries
+                if entry.name.endswith(".json") and entry.name != "_folders.json"
+                and entry.is_file()
+            }
     
     # Parcourir les chunks et vérifier s'ils ont une métadonnée
+    # (chemin, taille) : la taille est lue une seule fois, pendant le parcours
     orphaned_chunks = []
     if chunks_dir.exists():
-        for chunk_file in chunks_dir.glob("*.enc"):
-            # Extraire le file_id du nom du chunk (format: file_id_chunk_XXXX.enc)
-            parts = chunk_file.stem.split("_chunk_")
-            if len(parts) == 2:
-                file_id = parts[0]
-                if file_id not in valid_file_ids:
-                    orphaned_chunks.append(chunk_file)
+        with os.scandir(chunks_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".enc"):
+                    continue
+                # Extraire le file_id du nom du chunk (format: file_id_chunk_XXXX.enc)
+                name = entry.name
+                i = name.rfind("_chunk_")
+                if i > 0:
+                    file_id = name[:i]
+                    if file_id not in valid_file_ids:
+                        orphaned_chunks.append((entry.path, entry.stat().st_size))
     
     if not orphaned_chunks:
         print("✅ Aucun fichier orphelin trouvé")
@@ -491,7 +839,7 @@ def clean(
     
     print(f"📦 {len(orphaned_chunks)} chunks orphelins trouvés")
     
-    total_size = sum(chunk.stat().st_size for chunk in orphaned_chunks)
+    total_size = sum(size for _, size in orphaned_chunks)
     print(f"💾 Taille totale: {format_size(total_size)}\n")
     
     if not confirm:
@@ -500,22 +848,50 @@ def clean(
             print("❌ Opération annulée")
             return
     
-    # Supprimer les chunks orphelins
+    # Supprimer les chunks orphelins (suppressions réparties sur un pool de threads)
     deleted_count = 0
     deleted_size = 0
-    for chunk in orphaned_chunks:
-        try:
-            size = chunk.stat().st_size
-            chunk.unlink()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = executor.map(_unlink_chunk, (path for path, _ in orphaned_chunks))
+        for (path, size), error in zip(orphaned_chunks, results):
+            if error is not None:
+                print(f"⚠️  Erreur lors de la suppression de {os.path.basename(path)}: {error}")
+                continue
             deleted_count += 1
             deleted_size += size
-        except Exception as e:
-            print(f"⚠️  Erreur lors de la suppression de {chunk.name}: {e}")
     
     print(f"\n✅ {deleted_count} chunks supprimés")
     print(f"💾 Espace libéré: {format_size(deleted_size)}")
 
 
+def _remove_entry(entry: os.DirEntry) -> None:
+    """Supprime une entrée de dossier (sous-arborescence ou fichier)"""
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path)
+    else:
+        os.unlink(entry.path)
+
+
+def _rmtree_parallel(path: Path, executor: ThreadPoolExecutor) -> None:
+    """
+    Supprime une arborescence en répartissant ses entrées de premier niveau
+    sur un pool de threads, puis supprime le dossier lui-même
+    
+    Args:
+        path: Dossier à supprimer
+        executor: Pool de threads utilisé pour les suppressions
+    """
+    if path.is_symlink():
+        # Ne jamais descendre dans la cible d'un lien : shutil.rmtree refuse
+        # les liens symboliques, comme avant la parallélisation
+        shutil.rmtree(path)
+        return
+    with os.scandir(path) as entries:
+        # list() propage la première erreur rencontrée
+        list(executor.map(_remove_entry, list(entries)))
+    os.rmdir(path)
+
+
 @app.command()
 def clean_test(
     confirm: bool = typer.Option(False, "--yes", "-y", help="Confirmer sans demander")
@@ -523,9 +899,9 @@ def clean_test(
     """🧹 Nettoie les données de test (test_keys/ et test_output/)"""
     test_keys_dir = PROJECT_ROOT / "test_keys"
     test_output_dir = PROJECT_ROOT / "test_output"
-    test_config_file = Path(__file__).parent / "host_config.test.json"
-    test_log_file = Path(__file__).parent / "host.test.log"
-    test_pid_file = Path(__file__).parent / ".server.test.pid"
+    test_config_file = _config_path(True)
+    test_log_file = _log_path(True)
+    test_pid_file = _pid_path(True)
     
     has_data = (test_keys_dir.exists() and any(test_keys_dir.iterdir())) or \
                (test_output_dir.exists() and any(test_output_dir.iterdir()))
@@ -544,22 +920,17 @@ def clean_test(
     
     deleted_count = 0
     
-    # Supprimer les dossiers de test
-    if test_keys_dir.exists():
-        try:
-            shutil.rmtree(test_keys_dir)
-            print(f"✅ Supprimé: {test_keys_dir}")
-            deleted_count += 1
-        except Exception as e:
-            print(f"⚠️  Erreur lors de la suppression de {test_keys_dir}: {e}")
-    
-    if test_output_dir.exists():
-        try:
-            shutil.rmtree(test_output_dir)
-            print(f"✅ Supprimé: {test_output_dir}")
-            deleted_count += 1
-        except Exception as e:
-            print(f"⚠️  Erreur lors de la suppression de {test_output_dir}: {e}")
+    # Supprimer les dossiers de test (entrées réparties sur un pool de threads)
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+        for test_dir in (test_keys_dir, test_output_dir):
+            if not test_dir.exists():
+                continue
+            try:
+                _rmtree_parallel(test_dir, executor)
+                print(f"✅ Supprimé: {test_dir}")
+                deleted_count += 1
+            except Exception as e:
+                print(f"⚠️  Erreur lors de la suppression de {test_dir}: {e}")
     
     # Supprimer les fichiers de configuration/test
     for file_path in [test_config_file, test_log_file, test_pid_file]:
@@ -619,7 +990,13 @@ def init():
         "log_level": "info"
     }
     
-    save_config(config)
+    # Réinitialisation avec des valeurs identiques : rien à écrire
+    # (un fichier illisible est toujours réécrit)
+    on_disk, loaded = _load_config_with_status()
+    if loaded and config == on_disk:
+        print(f"ℹ️  Configuration inchangée ({config_file})")
+    else:
+        save_config(config)
     
     # Créer les répertoires
     Path(config["keys_dir"]).mkdir(parents=True, exist_ok=True)